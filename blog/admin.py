@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.db.models import Count
 from .models import Post, Tag, Comment, Like, Bookmark
 
 @admin.register(Post)
@@ -10,6 +11,7 @@ class PostAdmin(admin.ModelAdmin):
     date_hierarchy = 'created_at'
     ordering = ['-created_at']
     filter_horizontal = ['tags']
+    list_select_related = ['author']
     
     fieldsets = (
         ('Basic Information', {
@@ -39,9 +41,14 @@ class TagAdmin(admin.ModelAdmin):
     search_fields = ['name']
     prepopulated_fields = {'slug': ('name',)}
     
+    def get_queryset(self, request):
+        # Annotate once instead of one COUNT query per tag row
+        return super().get_queryset(request).annotate(_post_count=Count('posts'))
+    
     def post_count(self, obj):
-        return obj.posts.count()
+        return obj._post_count
     post_count.short_description = 'Number of Posts'
+    post_count.admin_order_field = '_post_count'
 
 @admin.register(Comment)
 class CommentAdmin(admin.ModelAdmin):
@@ -49,6 +56,7 @@ class CommentAdmin(admin.ModelAdmin):
     list_filter = ['created_at']
     search_fields = ['content', 'author__username', 'post__title']
     date_hierarchy = 'created_at'
+    list_select_related = ['author', 'post', 'parent']
     
     def content_preview(self, obj):
         return obj.content[:50] + '...' if len(obj.content) > 50 else obj.content
@@ -60,6 +68,7 @@ class LikeAdmin(admin.ModelAdmin):
     list_filter = ['created_at']
     search_fields = ['user__username', 'post__title']
     date_hierarchy = 'created_at'
+    list_select_related = ['user', 'post']
 
 @admin.register(Bookmark)
 class BookmarkAdmin(admin.ModelAdmin):
@@ -67,3 +76,4 @@ class BookmarkAdmin(admin.ModelAdmin):
     list_filter = ['created_at']
     search_fields = ['user__username', 'post__title']
     date_hierarchy = 'created_at'
+    list_select_related = ['user', 'post']
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-08-30 09:57
+
+from django.db import migrations, models
+
+
+def backfill_reading_time(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    for post in Post.objects.only('id', 'content').iterator():
+        word_count = len(post.content.split())
+        Post.objects.filter(pk=post.pk).update(
+            reading_time=max(1, round(word_count / 200))
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_comment_likes_count_commentlike'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='reading_time',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.RunPython(backfill_reading_time, migrations.RunPython.noop),
+    ]
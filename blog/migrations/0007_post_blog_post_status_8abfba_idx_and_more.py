@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-08-30 10:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_post_reading_time'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['status', '-created_at'], name='blog_post_status_8abfba_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', '-created_at'], name='blog_post_author__418f7f_idx'),
+        ),
+    ]
@@ -36,6 +36,7 @@ class Post(models.Model):
     views_count = models.PositiveIntegerField(default=0)
     likes_count = models.PositiveIntegerField(default=0)
     comments_count = models.PositiveIntegerField(default=0)
+    reading_time = models.PositiveIntegerField(default=1)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     published_at = models.DateTimeField(null=True, blank=True)
@@ -46,6 +47,9 @@ class Post(models.Model):
             models.Index(fields=['-created_at']),
             models.Index(fields=['slug']),
             models.Index(fields=['status']),
+            # Composite indexes matching the list view's filter + ORDER BY
+            models.Index(fields=['status', '-created_at']),
+            models.Index(fields=['author', '-created_at']),
         ]
     
     def save(self, *args, **kwargs):
@@ -65,18 +69,17 @@ class Post(models.Model):
         # Set published_at when status changes to published
         if self.status == 'published' and not self.published_at:
             self.published_at = timezone.now()
-        
+
+        # Recalculate estimated reading time (stored so list views can
+        # skip fetching content entirely)
+        if self.content:
+            word_count = len(self.content.split())
+            self.reading_time = max(1, round(word_count / 200))  # Average reading speed
+
         super().save(*args, **kwargs)
-    
+
     def __str__(self):
         return self.title
-    
-    @property
-    def reading_time(self):
-        """Calculate estimated reading time in minutes"""
-        word_count = len(self.content.split())
-        minutes = word_count / 200  # Average reading speed
-        return max(1, round(minutes))
 
     def update_comments_count(self):
         """Update the comments count for this post"""
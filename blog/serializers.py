@@ -1,14 +1,55 @@
+import copy
+
 from rest_framework import serializers
+from rest_framework.reverse import reverse
 from django.contrib.auth.models import User
-from .models import Post, Tag, Comment, Like, Bookmark
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.utils.text import slugify
+from .models import Post, Tag, Comment, Like, CommentLike
+
+class CachedFieldsSerializerMixin:
+    """Cache the field map built by get_fields() per serializer class.
+
+    ModelSerializer introspection (build_field & friends) is pure CPU
+    overhead repeated for every instance; list endpoints instantiate these
+    serializers dozens of times per request. Cache the unbound fields once
+    per class and hand out shallow copies, which DRF then binds normally.
+    """
+    _fields_cache = {}
+
+    def get_fields(self):
+        cls = self.__class__
+        if cls not in CachedFieldsSerializerMixin._fields_cache:
+            CachedFieldsSerializerMixin._fields_cache[cls] = super().get_fields()
+        return {
+            name: copy.copy(field)
+            for name, field in CachedFieldsSerializerMixin._fields_cache[cls].items()
+        }
+
+def absolute_file_uri(context, file_field):
+    """Build an absolute URL for a file field, memoized per request.
+
+    Serializer context is shared across every row (and nested serializer)
+    of a response, so repeated images/avatars resolve to one
+    build_absolute_uri call instead of one per rendered object.
+    """
+    request = context.get('request')
+    if request is None:
+        return None
+    url_cache = context.setdefault('_url_cache', {})
+    name = file_field.name
+    if name not in url_cache:
+        url_cache[name] = request.build_absolute_uri(file_field.url)
+    return url_cache[name]
 
-class TagSerializer(serializers.ModelSerializer):
+class TagSerializer(CachedFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Tag
         fields = ['id', 'name', 'slug']
         read_only_fields = ['slug']
 
-class AuthorSerializer(serializers.ModelSerializer):
+class AuthorSerializer(CachedFieldsSerializerMixin, serializers.ModelSerializer):
     profile_picture = serializers.SerializerMethodField()
     
     class Meta:
@@ -16,29 +57,54 @@ class AuthorSerializer(serializers.ModelSerializer):
         fields = ['id', 'username', 'email', 'profile_picture']
     
     def get_profile_picture(self, obj):
-        if hasattr(obj, 'profile') and obj.profile.profile_picture:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.profile.profile_picture.url)
+        # Callers must select_related('author__profile'); without it this
+        # reverse one-to-one lookup costs a query per author
+        profile = getattr(obj, 'profile', None)
+        if profile and profile.profile_picture:
+            return absolute_file_uri(self.context, profile.profile_picture)
         return None
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(CachedFieldsSerializerMixin, serializers.ModelSerializer):
     author = AuthorSerializer(read_only=True)
     replies = serializers.SerializerMethodField()
     can_edit = serializers.SerializerMethodField()
     can_delete = serializers.SerializerMethodField()
     is_liked = serializers.SerializerMethodField()
     likes_count = serializers.ReadOnlyField()
-    
+    has_more_replies = serializers.SerializerMethodField()
+    replies_url = serializers.SerializerMethodField()
+
     class Meta:
         model = Comment
-        fields = ['id', 'post', 'author', 'content', 'parent', 'replies', 'created_at', 'updated_at', 'can_edit', 'can_delete', 'is_liked', 'likes_count']
+        fields = ['id', 'post', 'author', 'content', 'parent', 'replies', 'created_at', 'updated_at', 'can_edit', 'can_delete', 'is_liked', 'likes_count', 'has_more_replies', 'replies_url']
         read_only_fields = ['author', 'created_at', 'updated_at']
-    
+
     def get_replies(self, obj):
-        if obj.replies.exists():
-            return CommentSerializer(obj.replies.all(), many=True, context=self.context).data
+        # Stop recursing past MAX_REPLY_DEPTH; has_more_replies flags the
+        # truncation for the client
+        depth = self.context.get('reply_depth', 0)
+        if depth >= MAX_REPLY_DEPTH:
+            return []
+        # .all() honors the prefetch cache; .exists() would issue a fresh
+        # query per comment even when replies are prefetched
+        replies = obj.replies.all()
+        if replies:
+            context = dict(self.context, reply_depth=depth + 1)
+            return CommentSerializer(replies, many=True, context=context).data
         return []
+
+    def _is_truncated(self, obj):
+        if self.context.get('reply_depth', 0) < MAX_REPLY_DEPTH:
+            return False
+        return bool(obj.replies.all())
+
+    def get_has_more_replies(self, obj):
+        return self._is_truncated(obj)
+
+    def get_replies_url(self, obj):
+        if self._is_truncated(obj):
+            return reverse('comment-detail', args=[obj.pk], request=self.context.get('request'))
+        return None
     
     def get_can_edit(self, obj):
         request = self.context.get('request')
@@ -53,21 +119,130 @@ class CommentSerializer(serializers.ModelSerializer):
         return False
     
     def get_is_liked(self, obj):
+        liked_comment_ids = self.context.get('liked_comment_ids')
+        if liked_comment_ids is not None:
+            return obj.id in liked_comment_ids
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            from .models import CommentLike
             return CommentLike.objects.filter(comment=obj, user=request.user).exists()
         return False
 
-class PostListSerializer(serializers.ModelSerializer):
+# Bounds on comment rendering so a single huge or deeply nested thread
+# cannot blow up response time or memory
+TOP_LEVEL_COMMENTS_LIMIT = 20
+MAX_REPLY_DEPTH = 4
+
+COMMENT_TREE_SQL = """
+WITH RECURSIVE tree AS (
+    SELECT c.id, c.post_id, c.author_id, c.content, c.parent_id,
+           c.likes_count, c.created_at, c.updated_at, 0 AS depth
+    FROM (
+        SELECT * FROM blog_comment
+        WHERE post_id = %s AND parent_id IS NULL
+        ORDER BY created_at DESC
+        LIMIT %s
+    ) c
+    UNION ALL
+    SELECT c.id, c.post_id, c.author_id, c.content, c.parent_id,
+           c.likes_count, c.created_at, c.updated_at, tree.depth + 1
+    FROM blog_comment c
+    JOIN tree ON c.parent_id = tree.id
+    WHERE tree.depth < %s
+)
+SELECT tree.id, tree.post_id, tree.author_id, tree.content, tree.parent_id,
+       tree.likes_count, tree.created_at, tree.updated_at, tree.depth,
+       au.username, au.email, up.profile_picture,
+       EXISTS(
+           SELECT 1 FROM blog_commentlike cl
+           WHERE cl.comment_id = tree.id AND cl.user_id = %s
+       ) AS is_liked,
+       EXISTS(
+           SELECT 1 FROM blog_comment ch WHERE ch.parent_id = tree.id
+       ) AS has_replies
+FROM tree
+JOIN auth_user au ON au.id = tree.author_id
+LEFT JOIN accounts_userprofile up ON up.user_id = tree.author_id
+ORDER BY tree.depth, tree.created_at DESC
+"""
+
+def get_comment_tree(post_id, request):
+    """Serialize a post's full comment tree from one recursive CTE query.
+
+    Fetches every node (with author and is_liked resolved in SQL) in a
+    single roundtrip, then links replies in one linear pass over plain
+    dicts — no per-node queries and no serializer instantiation. Output
+    matches CommentSerializer's shape. Top-level comments are capped at
+    TOP_LEVEL_COMMENTS_LIMIT (newest first) and recursion stops at
+    MAX_REPLY_DEPTH; truncated nodes carry has_more_replies plus a URL
+    to fetch the deeper thread.
+    """
+    user = getattr(request, 'user', None) if request else None
+    user_id = user.id if user is not None and user.is_authenticated else None
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            COMMENT_TREE_SQL,
+            [post_id, TOP_LEVEL_COMMENTS_LIMIT, MAX_REPLY_DEPTH, user_id],
+        )
+        columns = [col[0] for col in cursor.description]
+        rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    url_cache = {}
+
+    def picture_url(name):
+        if not name or request is None:
+            return None
+        if name not in url_cache:
+            url_cache[name] = request.build_absolute_uri(default_storage.url(name))
+        return url_cache[name]
+
+    nodes = {}
+    top_level = []
+    for row in rows:
+        is_own = user_id is not None and row['author_id'] == user_id
+        truncated = row['depth'] >= MAX_REPLY_DEPTH and bool(row['has_replies'])
+        node = {
+            'id': row['id'],
+            'post': row['post_id'],
+            'author': {
+                'id': row['author_id'],
+                'username': row['username'],
+                'email': row['email'],
+                'profile_picture': picture_url(row['profile_picture']),
+            },
+            'content': row['content'],
+            'parent': row['parent_id'],
+            'replies': [],
+            'created_at': row['created_at'],
+            'updated_at': row['updated_at'],
+            'can_edit': is_own,
+            'can_delete': is_own,
+            'is_liked': bool(row['is_liked']),
+            'likes_count': row['likes_count'],
+            'has_more_replies': truncated,
+            'replies_url': (
+                reverse('comment-detail', args=[row['id']], request=request)
+                if truncated else None
+            ),
+        }
+        nodes[node['id']] = node
+        if row['parent_id'] is None:
+            top_level.append(node)
+        else:
+            nodes[row['parent_id']]['replies'].append(node)
+    return top_level
+
+class PostListSerializer(CachedFieldsSerializerMixin, serializers.ModelSerializer):
     author = AuthorSerializer(read_only=True)
     tags = TagSerializer(many=True, read_only=True)
     featured_image = serializers.SerializerMethodField()
-    comments_count = serializers.IntegerField(source='comments.count', read_only=True)
+    comments_count = serializers.IntegerField(read_only=True)
     reading_time = serializers.IntegerField(read_only=True)
-    is_liked = serializers.SerializerMethodField()
-    is_bookmarked = serializers.SerializerMethodField()
-    
+    # Annotated onto the queryset with Exists() for authenticated users;
+    # the default covers anonymous/unannotated paths
+    is_liked = serializers.BooleanField(read_only=True, default=False)
+    is_bookmarked = serializers.BooleanField(read_only=True, default=False)
+
     class Meta:
         model = Post
         fields = [
@@ -79,23 +254,9 @@ class PostListSerializer(serializers.ModelSerializer):
     
     def get_featured_image(self, obj):
         if obj.featured_image:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.featured_image.url)
+            return absolute_file_uri(self.context, obj.featured_image)
         return None
     
-    def get_is_liked(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return Like.objects.filter(post=obj, user=request.user).exists()
-        return False
-    
-    def get_is_bookmarked(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return Bookmark.objects.filter(post=obj, user=request.user).exists()
-        return False
-
 class PostDetailSerializer(PostListSerializer):
     comments = serializers.SerializerMethodField()
     
@@ -103,9 +264,56 @@ class PostDetailSerializer(PostListSerializer):
         fields = PostListSerializer.Meta.fields + ['content', 'comments']
     
     def get_comments(self, obj):
-        # Only get top-level comments (no parent)
-        top_level_comments = obj.comments.filter(parent=None)
-        return CommentSerializer(top_level_comments, many=True, context=self.context).data
+        return get_comment_tree(obj.pk, self.context.get('request'))
+
+def trending_serialize(post_ids, request=None):
+    """Serialize trending posts as plain dicts from one values() query.
+
+    The trending endpoint is hit on every homepage load; skipping model
+    and serializer instantiation for its ten rows is a straight CPU win.
+    Rows come back in the order of post_ids.
+    """
+    if not post_ids:
+        return []
+    rows = Post.objects.filter(pk__in=post_ids).values(
+        'id', 'title', 'slug', 'excerpt', 'featured_image',
+        'author__id', 'author__username', 'author__email',
+        'author__profile__profile_picture',
+        'views_count', 'likes_count', 'comments_count', 'reading_time',
+        'created_at', 'published_at',
+    )
+
+    url_cache = {}
+
+    def file_url(name):
+        if not name or request is None:
+            return None
+        if name not in url_cache:
+            url_cache[name] = request.build_absolute_uri(default_storage.url(name))
+        return url_cache[name]
+
+    by_id = {}
+    for row in rows:
+        by_id[row['id']] = {
+            'id': row['id'],
+            'title': row['title'],
+            'slug': row['slug'],
+            'excerpt': row['excerpt'],
+            'featured_image': file_url(row['featured_image']),
+            'author': {
+                'id': row['author__id'],
+                'username': row['author__username'],
+                'email': row['author__email'],
+                'profile_picture': file_url(row['author__profile__profile_picture']),
+            },
+            'views_count': row['views_count'],
+            'likes_count': row['likes_count'],
+            'comments_count': row['comments_count'],
+            'reading_time': row['reading_time'],
+            'created_at': row['created_at'],
+            'published_at': row['published_at'],
+        }
+    return [by_id[post_id] for post_id in post_ids if post_id in by_id]
 
 class PostCreateUpdateSerializer(serializers.ModelSerializer):
     tags = serializers.ListField(
@@ -123,32 +331,36 @@ class PostCreateUpdateSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['slug', 'created_at', 'updated_at']
     
+    def _set_tags(self, post, tags_data):
+        """Attach tags in three queries: one SELECT, one bulk INSERT, one M2M add."""
+        names = {name.strip().lower() for name in tags_data if name.strip()}
+        if not names:
+            return
+        existing = set(Tag.objects.filter(name__in=names).values_list('name', flat=True))
+        missing = [Tag(name=name, slug=slugify(name)) for name in names - existing]
+        if missing:
+            Tag.objects.bulk_create(missing, ignore_conflicts=True)
+        post.tags.add(*Tag.objects.filter(name__in=names))
+
     def create(self, validated_data):
         tags_data = validated_data.pop('tags', [])
         post = Post.objects.create(**validated_data)
-        
-        # Handle tags
-        for tag_name in tags_data:
-            tag, created = Tag.objects.get_or_create(name=tag_name.strip().lower())
-            post.tags.add(tag)
-        
+        self._set_tags(post, tags_data)
         return post
-    
+
     def update(self, instance, validated_data):
         tags_data = validated_data.pop('tags', None)
-        
+
         # Update post fields
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         instance.save()
-        
+
         # Update tags if provided
         if tags_data is not None:
             instance.tags.clear()
-            for tag_name in tags_data:
-                tag, created = Tag.objects.get_or_create(name=tag_name.strip().lower())
-                instance.tags.add(tag)
-        
+            self._set_tags(instance, tags_data)
+
         return instance
 
 class LikeSerializer(serializers.ModelSerializer):
@@ -156,11 +368,3 @@ class LikeSerializer(serializers.ModelSerializer):
         model = Like
         fields = ['id', 'post', 'user', 'created_at']
         read_only_fields = ['user', 'created_at']
-
-class BookmarkSerializer(serializers.ModelSerializer):
-    post_detail = PostListSerializer(source='post', read_only=True)
-    
-    class Meta:
-        model = Bookmark
-        fields = ['id', 'post', 'post_detail', 'user', 'created_at']
-        read_only_fields = ['user', 'created_at']
\ No newline at end of file
@@ -1,8 +1,11 @@
 from django.urls import path, include
-from rest_framework.routers import DefaultRouter
+from rest_framework.routers import SimpleRouter
 from .views import PostViewSet, TagViewSet, CommentViewSet, BookmarkViewSet
 
-router = DefaultRouter()
+# SimpleRouter skips DefaultRouter's API root and format-suffix patterns,
+# which nothing uses, leaving fewer patterns for the resolver to try per
+# request. Trailing slashes stay on for existing clients.
+router = SimpleRouter()
 router.register(r'posts', PostViewSet, basename='post')
 router.register(r'tags', TagViewSet, basename='tag')
 router.register(r'comments', CommentViewSet, basename='comment')
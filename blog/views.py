@@ -3,15 +3,31 @@ from rest_framework import viewsets, status, filters, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
-from django.db.models import Q, Count, F
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q, Count, F, Prefetch, Exists, OuterRef
+from django.db.models.functions import Greatest
 from django.shortcuts import get_object_or_404
 from .models import Post, Tag, Comment, Like, Bookmark, CommentLike
 from .serializers import (
     PostListSerializer, PostDetailSerializer, PostCreateUpdateSerializer,
-    TagSerializer, CommentSerializer, LikeSerializer, BookmarkSerializer
+    TagSerializer, CommentSerializer, LikeSerializer, trending_serialize
 )
 from .permissions import IsAuthorOrReadOnly
 
+def annotate_user_flags(queryset, user):
+    """Annotate is_liked/is_bookmarked Exists flags on a Post queryset.
+
+    Every queryset serialized by PostListSerializer must go through this
+    for authenticated users, or both flags silently render False.
+    """
+    if not user.is_authenticated:
+        return queryset
+    return queryset.annotate(
+        is_liked=Exists(Like.objects.filter(post=OuterRef('pk'), user=user)),
+        is_bookmarked=Exists(Bookmark.objects.filter(post=OuterRef('pk'), user=user)),
+    )
+
 class PostViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly]
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
@@ -20,8 +36,17 @@ class PostViewSet(viewsets.ModelViewSet):
     ordering = ['-created_at']
     
     def get_queryset(self):
-        queryset = Post.objects.select_related('author', 'author__profile').prefetch_related('tags', 'comments')
-        
+        queryset = Post.objects.select_related('author', 'author__profile').prefetch_related('tags')
+        # Computed by the DB in the main query; the serializer just reads
+        # the booleans
+        queryset = annotate_user_flags(queryset, self.request.user)
+        # retrieve keeps full columns; its comment tree comes from the
+        # recursive CTE in get_comment_tree, not a prefetch
+        if self.action in ('list', 'my_posts', 'trending'):
+            # content is by far the widest column and the list serializer
+            # never renders it
+            queryset = queryset.defer('content')
+
         # Filter by status
         status_filter = self.request.query_params.get('status', None)
         if status_filter:
@@ -67,11 +92,11 @@ class PostViewSet(viewsets.ModelViewSet):
     
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
-        # Increment view count
-        instance.views_count = F('views_count') + 1
-        instance.save(update_fields=['views_count'])
-        instance.refresh_from_db()
-        
+        # Increment view count atomically; bump the in-memory copy so the
+        # serializer reflects it without another SELECT
+        Post.objects.filter(pk=instance.pk).update(views_count=F('views_count') + 1)
+        instance.views_count += 1
+
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
     
@@ -90,34 +115,37 @@ class PostViewSet(viewsets.ModelViewSet):
     def like(self, request, pk=None):
         """Like or unlike a post"""
         post = self.get_object()
-        like, created = Like.objects.get_or_create(post=post, user=request.user)
-        
-        if not created:
-            # Unlike
-            like.delete()
-            post.likes_count = max(0, post.likes_count - 1)
-            post.save(update_fields=['likes_count'])
-            return Response({'status': 'unliked', 'likes_count': post.likes_count})
-        else:
-            # Like
-            post.likes_count = F('likes_count') + 1
-            post.save(update_fields=['likes_count'])
-            post.refresh_from_db()
-            return Response({'status': 'liked', 'likes_count': post.likes_count})
+        with transaction.atomic():
+            # Toggle with a delete-first pattern: one query on either path
+            # instead of get_or_create's SELECT + INSERT.
+            deleted, _ = Like.objects.filter(post=post, user=request.user).delete()
+
+            if deleted:
+                # Unlike: atomic decrement, clamped at zero
+                Post.objects.filter(pk=post.pk).update(
+                    likes_count=Greatest(F('likes_count') - 1, 0)
+                )
+                return Response({'status': 'unliked', 'likes_count': max(0, post.likes_count - 1)})
+            else:
+                # Like: atomic increment
+                Like.objects.create(post=post, user=request.user)
+                Post.objects.filter(pk=post.pk).update(likes_count=F('likes_count') + 1)
+                return Response({'status': 'liked', 'likes_count': post.likes_count + 1})
     
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def bookmark(self, request, pk=None):
         """Bookmark or unbookmark a post"""
         post = self.get_object()
-        bookmark, created = Bookmark.objects.get_or_create(post=post, user=request.user)
-        
-        if not created:
-            # Remove bookmark
-            bookmark.delete()
-            return Response({'status': 'unbookmarked'})
-        else:
-            # Add bookmark
-            return Response({'status': 'bookmarked'})
+        with transaction.atomic():
+            deleted, _ = Bookmark.objects.filter(post=post, user=request.user).delete()
+
+            if deleted:
+                # Remove bookmark
+                return Response({'status': 'unbookmarked'})
+            else:
+                # Add bookmark
+                Bookmark.objects.create(post=post, user=request.user)
+                return Response({'status': 'bookmarked'})
     
     @action(detail=True, methods=['get', 'post'], permission_classes=[IsAuthenticatedOrReadOnly])
     def comments(self, request, pk=None):
@@ -125,8 +153,25 @@ class PostViewSet(viewsets.ModelViewSet):
         post = self.get_object()
         
         if request.method == 'GET':
-            comments = Comment.objects.filter(post=post, parent=None).select_related('author')
-            serializer = CommentSerializer(comments, many=True, context={'request': request})
+            comments = Comment.objects.filter(post=post, parent=None).select_related(
+                'author', 'author__profile'
+            ).prefetch_related(
+                Prefetch('replies', queryset=Comment.objects.select_related('author', 'author__profile'))
+            )
+            context = {'request': request}
+            if request.user.is_authenticated:
+                # One query answers is_liked for every rendered comment
+                context['liked_comment_ids'] = set(
+                    CommentLike.objects.filter(user=request.user, comment__post=post)
+                    .values_list('comment_id', flat=True)
+                )
+            # Page top-level comments so one huge thread can't render
+            # unbounded output
+            page = self.paginate_queryset(comments)
+            if page is not None:
+                serializer = CommentSerializer(page, many=True, context=context)
+                return self.get_paginated_response(serializer.data)
+            serializer = CommentSerializer(comments, many=True, context=context)
             return Response(serializer.data)
         
         elif request.method == 'POST':
@@ -136,15 +181,24 @@ class PostViewSet(viewsets.ModelViewSet):
                 return Response(serializer.data, status=status.HTTP_201_CREATED)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
+    TRENDING_CACHE_KEY = 'trending_posts_v1'
+    TRENDING_CACHE_TIMEOUT = 60
+
     @action(detail=False, methods=['get'])
     def trending(self, request):
         """Get trending posts based on views and likes"""
-        queryset = self.get_queryset().filter(status='published').annotate(
-            engagement=F('views_count') + F('likes_count') * 2
-        ).order_by('-engagement')[:10]
-        
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        # The engagement ORDER BY is a full scan, so cache the winning IDs
+        # briefly and refetch just those rows with the usual prefetches.
+        post_ids = cache.get_or_set(
+            self.TRENDING_CACHE_KEY,
+            lambda: list(
+                Post.objects.filter(status='published').annotate(
+                    engagement=F('views_count') + F('likes_count') * 2
+                ).order_by('-engagement').values_list('id', flat=True)[:10]
+            ),
+            timeout=self.TRENDING_CACHE_TIMEOUT,
+        )
+        return Response(trending_serialize(post_ids, request))
 
 class TagViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Tag.objects.annotate(posts_count=Count('posts')).order_by('-posts_count')
@@ -155,18 +209,57 @@ class TagViewSet(viewsets.ReadOnlyModelViewSet):
     def posts(self, request, pk=None):
         """Get all posts for a specific tag"""
         tag = self.get_object()
-        posts = Post.objects.filter(tags=tag, status='published')
+        posts = Post.objects.filter(tags=tag, status='published').select_related(
+            'author', 'author__profile'
+        ).prefetch_related('tags').defer('content')
+        posts = annotate_user_flags(posts, request.user)
         serializer = PostListSerializer(posts, many=True, context={'request': request})
         return Response(serializer.data)
 
 class CommentViewSet(viewsets.ModelViewSet):
-    queryset = Comment.objects.select_related('author', 'post').all()
+    queryset = Comment.objects.select_related('author', 'author__profile', 'post').prefetch_related(
+        Prefetch('replies', queryset=Comment.objects.select_related('author', 'author__profile'))
+    )
     serializer_class = CommentSerializer
     permission_classes = [IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly]
     
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
-    
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        liked_comment_ids = getattr(self, '_liked_comment_ids', None)
+        if liked_comment_ids is not None:
+            context['liked_comment_ids'] = liked_comment_ids
+        return context
+
+    def _preload_liked_comment_ids(self, comments):
+        """Answer is_liked for every rendered comment in one query.
+
+        Scoped by post rather than an explicit ID list so nested replies
+        beyond the first prefetched level are covered too.
+        """
+        if not self.request.user.is_authenticated:
+            self._liked_comment_ids = set()
+            return
+        post_ids = {comment.post_id for comment in comments}
+        self._liked_comment_ids = set(
+            CommentLike.objects.filter(user=self.request.user, comment__post_id__in=post_ids)
+            .values_list('comment_id', flat=True)
+        )
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            self._preload_liked_comment_ids(page)
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        comments = list(queryset)
+        self._preload_liked_comment_ids(comments)
+        serializer = self.get_serializer(comments, many=True)
+        return Response(serializer.data)
+
     def update(self, request, *args, **kwargs):
         """Update comment - only author can edit"""
         comment = self.get_object()
@@ -232,30 +325,41 @@ class CommentViewSet(viewsets.ModelViewSet):
     def like(self, request, pk=None):
         """Like or unlike a comment"""
         comment = self.get_object()
-        like, created = CommentLike.objects.get_or_create(comment=comment, user=request.user)
-        
-        if not created:
-            # Unlike
-            like.delete()
-            comment.likes_count = max(0, comment.likes_count - 1)
-            comment.save(update_fields=['likes_count'])
-            return Response({
-                'status': 'unliked',
-                'likes_count': comment.likes_count
-            })
-        else:
-            # Like
-            comment.likes_count = F('likes_count') + 1
-            comment.save(update_fields=['likes_count'])
-            comment.refresh_from_db()
-            return Response({
-                'status': 'liked',
-                'likes_count': comment.likes_count
-            })
+        with transaction.atomic():
+            deleted, _ = CommentLike.objects.filter(comment=comment, user=request.user).delete()
+
+            if deleted:
+                # Unlike: atomic decrement, clamped at zero
+                Comment.objects.filter(pk=comment.pk).update(
+                    likes_count=Greatest(F('likes_count') - 1, 0)
+                )
+                return Response({
+                    'status': 'unliked',
+                    'likes_count': max(0, comment.likes_count - 1)
+                })
+            else:
+                # Like: atomic increment
+                CommentLike.objects.create(comment=comment, user=request.user)
+                Comment.objects.filter(pk=comment.pk).update(likes_count=F('likes_count') + 1)
+                return Response({
+                    'status': 'liked',
+                    'likes_count': comment.likes_count + 1
+                })
 
 class BookmarkViewSet(viewsets.ReadOnlyModelViewSet):
-    serializer_class = BookmarkSerializer
+    """List the current user's bookmarked posts.
+
+    Serves Post rows directly instead of Bookmark rows with a nested
+    post_detail, halving the serializer work per response.
+    """
+    serializer_class = PostListSerializer
     permission_classes = [IsAuthenticated]
-    
+
     def get_queryset(self):
-        return Bookmark.objects.filter(user=self.request.user).select_related('post', 'post__author')
+        user = self.request.user
+        queryset = Post.objects.filter(bookmarks__user=user).select_related(
+            'author', 'author__profile'
+        ).prefetch_related('tags').defer('content')
+        return annotate_user_flags(queryset, user).annotate(
+            bookmarked_at=F('bookmarks__created_at'),
+        ).order_by('-bookmarked_at')